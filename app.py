@@ -2,19 +2,33 @@
 from __future__ import annotations
 
 import os
+import json
+import random
+import re
 import time
 import socket
 import signal
+import threading
 import traceback
-from typing import Any, Dict, Optional, List, Tuple
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Deque, Dict, Optional, List, Tuple
 
 import requests
+from requests.adapters import HTTPAdapter
+
+from worker_sizing import cgroup_cpu_limit
 
 try:
     import psutil  # type: ignore
 except Exception:
     psutil = None
 
+try:
+    import orjson  # type: ignore
+except Exception:
+    orjson = None
+
 
 # ---------------- config ----------------
 
@@ -27,12 +41,30 @@ AGENT_NAME = os.getenv("AGENT_NAME", socket.gethostname())
 HTTP_TIMEOUT_SEC = float(os.getenv("HTTP_TIMEOUT_SEC", "10"))
 IDLE_SLEEP_SEC = float(os.getenv("IDLE_SLEEP_SEC", "0.25"))
 
-# TPU agents should usually lease 1 task at a time
+# TPU agents should usually lease 1 task at a time.
+# With MAX_TASKS > 1 one lease round-trip fills a local queue that is drained
+# (still inline, one task at a time) before the next lease.
 MAX_TASKS = int(os.getenv("MAX_TASKS", "1"))
 LEASE_TIMEOUT_MS = int(os.getenv("LEASE_TIMEOUT_MS", "3000"))
 
 ERROR_LOG_EVERY_SEC = float(os.getenv("ERROR_LOG_EVERY_SEC", "10"))
+# failed-task traces sent to the controller are cut to the last N chars
+TRACE_MAX_CHARS = 4096
+# lease failures back off exponentially from ERROR_BACKOFF_SEC up to
+# ERROR_BACKOFF_MAX_SEC, plus up to 50% jitter so agents don't retry in lockstep
 ERROR_BACKOFF_SEC = float(os.getenv("ERROR_BACKOFF_SEC", "1.0"))
+ERROR_BACKOFF_MAX_SEC = float(os.getenv("ERROR_BACKOFF_MAX_SEC", "30"))
+
+# psutil is sampled by one background thread; leases read the cached value
+METRICS_SAMPLE_SEC = float(os.getenv("METRICS_SAMPLE_SEC", "0.5"))
+
+# keep-alive pool towards the controller (lease + result share it)
+HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "4"))
+
+# Result POSTs run on a few background threads so the next lease overlaps the
+# upload. 0 = post inline. RESULT_MAX_PENDING bounds unsent results.
+RESULT_POST_WORKERS = int(os.getenv("RESULT_POST_WORKERS", "2"))
+RESULT_MAX_PENDING = int(os.getenv("RESULT_MAX_PENDING", "8"))
 
 # Comma-separated
 TASKS_RAW = os.getenv("TASKS", "echo,map_classify_tpu")
@@ -41,7 +73,13 @@ TASKS_RAW = os.getenv("TASKS", "echo,map_classify_tpu")
 AGENT_LABELS_RAW = os.getenv("AGENT_LABELS", "")
 
 _running = True
+_stop_evt = threading.Event()
 _err_last: Dict[str, float] = {}
+_fail_streak = 0
+_metrics_cached: Dict[str, Any] = {}
+
+# (lease_id, task) pairs leased but not yet executed
+_pending: Deque[Tuple[str, Any]] = deque()
 
 
 # ---------------- utils ----------------
@@ -64,23 +102,121 @@ def _parse_labels(raw: str) -> Dict[str, Any]:
 
 
 def _log_err_ratelimited(key: str, msg: str) -> None:
-    now = time.time()
-    last = _err_last.get(key, 0.0)
-    if now - last >= ERROR_LOG_EVERY_SEC:
+    # monotonic: wall-clock jumps (NTP) must not mute or flood the log
+    now = time.monotonic()
+    last = _err_last.get(key)
+    if last is None or now - last >= ERROR_LOG_EVERY_SEC:
         _err_last[key] = now
         print(msg, flush=True)
 
 
-def _collect_metrics() -> Dict[str, Any]:
-    if psutil is None:
-        return {}
+def _format_trace(tb: Any) -> str:
+    # Frames only: type/message are sent alongside, and skipping the chained
+    # __context__ walk that format_exc() does keeps the failure path cheap.
+    out = "".join(traceback.format_list(traceback.extract_tb(tb, limit=12)))
+    return out[-TRACE_MAX_CHARS:]
+
+
+def _lease_backoff_sec() -> float:
+    global _fail_streak
+    delay = min(ERROR_BACKOFF_MAX_SEC, ERROR_BACKOFF_SEC * (2 ** min(_fail_streak, 16)))
+    _fail_streak += 1
+    return delay + random.uniform(0.0, delay / 2.0)
+
+
+def _read_first_line(path: str) -> Optional[str]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.readline().strip()
+    except Exception:
+        return None
+
+
+def _cgroup_usage_sec() -> Optional[float]:
+    """Cumulative CPU time charged to our cgroup (v2 cpu.stat, else v1 cpuacct)."""
+    try:
+        with open("/sys/fs/cgroup/cpu.stat", "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("usage_usec "):
+                    return int(line.split()[1]) / 1e6
+    except Exception:
+        pass
+
+    raw = _read_first_line("/sys/fs/cgroup/cpuacct/cpuacct.usage")
+    try:
+        return int(raw or "") / 1e9
+    except ValueError:
+        return None
+
+
+def _cpu_capacity(limit: Optional[float]) -> float:
+    try:
+        cores = float(len(os.sched_getaffinity(0)))
+    except AttributeError:
+        cores = float(os.cpu_count() or 1)
+    return max(0.01, min(limit, cores) if limit is not None else cores)
+
+
+# psutil.cpu_percent() is host-wide; inside a container with a CPU quota the
+# cgroup's own usage against its quota is what actually bounds us. Without a
+# quota, keep psutil's host-wide figure.
+_CPU_LIMIT = cgroup_cpu_limit()
+_CGROUP_ACCT = _CPU_LIMIT is not None and _cgroup_usage_sec() is not None
+_CPU_CAPACITY = _cpu_capacity(_CPU_LIMIT)
+
+
+def _cgroup_cpu_util(interval: float) -> Optional[float]:
+    u0 = _cgroup_usage_sec()
+    t0 = time.monotonic()
+    if u0 is None:
+        return None
+    _stop_evt.wait(interval)
+    u1 = _cgroup_usage_sec()
+    elapsed = time.monotonic() - t0
+    if u1 is None or elapsed <= 0:
+        return None
+    return max(0.0, min(1.0, (u1 - u0) / (elapsed * _CPU_CAPACITY)))
+
+
+def _sample_metrics(interval: Optional[float]) -> Dict[str, Any]:
+    out: Dict[str, Any] = {}
+    cg_util = _cgroup_cpu_util(interval) if (interval and _CGROUP_ACCT) else None
     try:
-        return {
-            "cpu_util": float(psutil.cpu_percent(interval=None)) / 100.0,
-            "ram_mb": float(psutil.virtual_memory().used) / (1024 * 1024),
-        }
+        if cg_util is not None:
+            out["cpu_util"] = cg_util
+        elif psutil is not None:
+            out["cpu_util"] = float(psutil.cpu_percent(interval=interval)) / 100.0
+        if psutil is not None:
+            out["ram_mb"] = float(psutil.virtual_memory().used) / (1024 * 1024)
     except Exception:
         return {}
+    return out
+
+
+def _sampler_loop() -> None:
+    global _metrics_cached
+    while not _stop_evt.is_set():
+        # blocking form: one usage delta per interval, which also paces the loop
+        m = _sample_metrics(METRICS_SAMPLE_SEC)
+        if m:
+            _metrics_cached = m
+        else:
+            _stop_evt.wait(METRICS_SAMPLE_SEC)
+
+
+def _start_sampler() -> None:
+    global _metrics_cached
+    if psutil is None and not _CGROUP_ACCT:
+        return
+    # seed so the first lease already carries ram_mb
+    _metrics_cached = _sample_metrics(None)
+    t = threading.Thread(target=_sampler_loop, name="metrics-sampler", daemon=True)
+    t.start()
+
+
+def _collect_metrics() -> Dict[str, Any]:
+    # dict is swapped whole by the sampler, so this read is always consistent
+    return _metrics_cached
 
 
 def _capabilities_list() -> List[str]:
@@ -140,10 +276,76 @@ OPS: Dict[str, Any] = {
 
 # ---------------- v1 http ----------------
 
-def _post_json(path: str, payload: Dict[str, Any]) -> Tuple[int, Any]:
-    url = f"{CONTROLLER_URL}{path}"
+# One session for the whole process: the lease long-poll reuses the same
+# TCP/TLS connection instead of reconnecting every cycle.
+_session = requests.Session()
+_adapter = HTTPAdapter(
+    pool_connections=max(1, HTTP_POOL_MAXSIZE),
+    pool_maxsize=max(1, HTTP_POOL_MAXSIZE),
+    pool_block=False,
+    max_retries=0,
+)
+_session.mount("http://", _adapter)
+_session.mount("https://", _adapter)
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+LEASES_URL = f"{CONTROLLER_URL}/v1/leases"
+RESULTS_URL = f"{CONTROLLER_URL}/v1/results"
+
+
+if orjson is not None:
+    _ORJSON_OPTS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _dumps(obj: Any) -> bytes:
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=_ORJSON_OPTS)
+        except TypeError:
+            # e.g. ints wider than 64 bits; stdlib json handles those
+            pass
+    return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+
+# orjson decodes integers outside 64 bits as floats; any 19+ digit run may be
+# one of those, so such bodies go through stdlib json, which keeps them exact.
+_WIDE_INT = re.compile(rb"\d{19}")
+
+
+def _loads(raw: bytes) -> Any:
+    if orjson is not None and not _WIDE_INT.search(raw):
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+# Everything in the lease request except "metrics" is fixed for the process
+# lifetime, so encode it once and only splice the metrics in per poll.
+_LEASE_PREFIX = _dumps({
+    "agent": AGENT_NAME,
+    "capabilities": {"ops": CAPS_LIST},
+    "max_tasks": MAX_TASKS,
+    "timeout_ms": LEASE_TIMEOUT_MS,
+    "labels": BASE_LABELS,
+    "worker_profile": WORKER_PROFILE,
+})[:-1]
+
+
+def _lease_body() -> bytes:
+    return _LEASE_PREFIX + b',"metrics":' + _dumps(_collect_metrics()) + b"}"
+
+
+def _post_json(url: str, payload: Dict[str, Any]) -> Tuple[int, Any]:
+    try:
+        body = _dumps(payload)
+    except Exception as e:
+        return 0, {"error": str(e), "url": url}
+    return _post_url(url, body)
+
+
+def _post_url(url: str, body: bytes) -> Tuple[int, Any]:
     try:
-        r = requests.post(url, json=payload, timeout=HTTP_TIMEOUT_SEC)
+        r = _session.post(url, data=body, headers=_JSON_HEADERS, timeout=HTTP_TIMEOUT_SEC)
     except Exception as e:
         return 0, {"error": str(e), "url": url}
 
@@ -151,27 +353,21 @@ def _post_json(path: str, payload: Dict[str, Any]) -> Tuple[int, Any]:
         return 204, None
 
     try:
-        body = r.json()
+        body = _loads(r.content)
     except Exception:
         body = r.text
 
     return r.status_code, body
 
 
-def _lease_once() -> Optional[Tuple[str, Dict[str, Any]]]:
-    payload: Dict[str, Any] = {
-        "agent": AGENT_NAME,
-        "capabilities": {"ops": CAPS_LIST},
-        "max_tasks": MAX_TASKS,
-        "timeout_ms": LEASE_TIMEOUT_MS,
-        "labels": BASE_LABELS,
-        "worker_profile": WORKER_PROFILE,
-        "metrics": _collect_metrics(),
-    }
-
-    code, body = _post_json("/v1/leases", payload)
+def _lease_once() -> int:
+    """
+    Lease up to MAX_TASKS tasks and append them to _pending.
+    Returns the number of tasks queued (0 on an empty lease).
+    """
+    code, body = _post_url(LEASES_URL, _lease_body())
     if code == 204:
-        return None
+        return 0
     if code == 0:
         raise RuntimeError(f"lease failed: {body}")
     if code >= 400:
@@ -186,13 +382,11 @@ def _lease_once() -> Optional[Tuple[str, Dict[str, Any]]]:
     if not isinstance(lease_id, str) or not lease_id:
         raise RuntimeError(f"lease missing lease_id: {body!r}")
     if not isinstance(tasks, list) or not tasks:
-        return None
+        return 0
 
-    task = tasks[0]
-    if not isinstance(task, dict):
-        raise RuntimeError(f"task not dict: {task!r}")
-
-    return lease_id, task
+    # malformed entries are rejected one by one when they are dequeued
+    _pending.extend((lease_id, t) for t in tasks)
+    return len(tasks)
 
 
 def _post_result(
@@ -203,6 +397,9 @@ def _post_result(
     result: Any = None,
     error: Any = None,
 ) -> None:
+    if isinstance(error, dict) and "_tb" in error:
+        error = dict(error)
+        error["trace"] = _format_trace(error.pop("_tb"))
     payload: Dict[str, Any] = {
         "lease_id": lease_id,
         "job_id": job_id,
@@ -211,13 +408,44 @@ def _post_result(
         "result": result,
         "error": error,
     }
-    code, body = _post_json("/v1/results", payload)
+    code, body = _post_json(RESULTS_URL, payload)
     if code == 0:
         raise RuntimeError(f"result failed: {body}")
     if code >= 400:
         raise RuntimeError(f"result HTTP {code}: {body}")
 
 
+_result_pool: Optional[ThreadPoolExecutor] = (
+    ThreadPoolExecutor(max_workers=RESULT_POST_WORKERS, thread_name_prefix="result-post")
+    if RESULT_POST_WORKERS > 0
+    else None
+)
+_result_slots = threading.BoundedSemaphore(max(1, RESULT_MAX_PENDING))
+
+
+def _post_result_logged(*args: Any, **kwargs: Any) -> None:
+    try:
+        _post_result(*args, **kwargs)
+    except Exception as e:
+        _log_err_ratelimited("result", f"[agent-tpu-v1] post result error: {e}")
+
+
+def _post_result_bg(*args: Any, **kwargs: Any) -> None:
+    try:
+        _post_result_logged(*args, **kwargs)
+    finally:
+        _result_slots.release()
+
+
+def _submit_result(*args: Any, **kwargs: Any) -> None:
+    if _result_pool is None:
+        _post_result_logged(*args, **kwargs)
+        return
+    # blocks the loop only when RESULT_MAX_PENDING results are still unsent
+    _result_slots.acquire()
+    _result_pool.submit(_post_result_bg, *args, **kwargs)
+
+
 def _extract_task(task: Dict[str, Any]) -> Tuple[str, str, Dict[str, Any], Optional[int]]:
     job_id = task.get("id") or task.get("job_id")
     op = task.get("op")
@@ -239,11 +467,12 @@ def _extract_task(task: Dict[str, Any]) -> Tuple[str, str, Dict[str, Any], Optio
 def _shutdown(signum: int, _frame: Any) -> None:
     global _running
     _running = False
+    _stop_evt.set()
     print(f"[agent-tpu-v1] shutdown signal {signum}", flush=True)
 
 
 def main() -> int:
-    global _running
+    global _running, _fail_streak
 
     signal.signal(signal.SIGINT, _shutdown)
     signal.signal(signal.SIGTERM, _shutdown)
@@ -254,21 +483,34 @@ def main() -> int:
 
     print(f"[agent-tpu-v1] starting name={AGENT_NAME} controller={CONTROLLER_URL} ops={CAPS_LIST}", flush=True)
 
-    while _running:
-        try:
-            leased = _lease_once()
-        except Exception as e:
-            _log_err_ratelimited("lease", f"[agent-tpu-v1] lease error: {e}")
-            time.sleep(ERROR_BACKOFF_SEC)
-            continue
+    _start_sampler()
 
-        if not leased:
-            time.sleep(IDLE_SLEEP_SEC)
-            continue
-
-        lease_id, task = leased
+    while _running:
+        if not _pending:
+            poll_ts = time.monotonic()
+            try:
+                leased = _lease_once()
+            except Exception as e:
+                _log_err_ratelimited("lease", f"[agent-tpu-v1] lease error: {e}")
+                _stop_evt.wait(_lease_backoff_sec())
+                continue
+
+            # any answer, even an empty lease, means the controller is up
+            _fail_streak = 0
+
+            if not leased:
+                # If the controller held the long-poll, we already waited;
+                # only pad out what is left of IDLE_SLEEP_SEC.
+                remaining = IDLE_SLEEP_SEC - (time.monotonic() - poll_ts)
+                if remaining > 0:
+                    _stop_evt.wait(remaining)
+                continue
+
+        lease_id, task = _pending.popleft()
 
         try:
+            if not isinstance(task, dict):
+                raise RuntimeError("task not dict")
             job_id, op, payload, job_epoch = _extract_task(task)
         except Exception as e:
             _log_err_ratelimited("task:bad", f"[agent-tpu-v1] bad task: {e} task={repr(task)[:300]}")
@@ -290,27 +532,29 @@ def main() -> int:
             err = {
                 "type": type(e).__name__,
                 "message": str(e),
-                "trace": traceback.format_exc(limit=12),
+                # formatted lazily in _post_result, only if we actually send it
+                "_tb": e.__traceback__,
             }
 
         duration_ms = (time.time() - start_ts) * 1000.0
 
-        try:
-            _post_result(
-                lease_id,
-                job_id,
-                job_epoch,
-                "succeeded" if ok else "failed",
-                result=(out if ok else None),
-                error=(None if ok else err),
-            )
-        except Exception as e:
-            _log_err_ratelimited("result", f"[agent-tpu-v1] post result error: {e}")
+        _submit_result(
+            lease_id,
+            job_id,
+            job_epoch,
+            "succeeded" if ok else "failed",
+            result=(out if ok else None),
+            error=(None if ok else err),
+        )
 
         if ok:
             print(f"[agent-tpu-v1] ok job={job_id} op={op} ms={duration_ms:.1f}", flush=True)
         else:
-            _log_err_ratelimited("exec", f"[agent-tpu-v1] FAIL job={job_id} op={op} ms={duration_ms:.1f} err={err}")
+            _log_err_ratelimited("exec", f"[agent-tpu-v1] FAIL job={job_id} op={op} ms={duration_ms:.1f} err={err['type']}: {err['message']}")
+
+    if _result_pool is not None:
+        # flush results already computed; their leases are still ours
+        _result_pool.shutdown(wait=True)
 
     print("[agent-tpu-v1] stopped", flush=True)
     return 0
@@ -1,15 +1,18 @@
 # ops/__init__.py
 from __future__ import annotations
 
-from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from types import MappingProxyType
+from typing import Any, Callable, Dict, FrozenSet, List, Mapping, Optional, Tuple
 import importlib
 import os
+import sys
 
 OPS_REGISTRY: Dict[str, Callable[..., Any]] = {}
 OPS_LOAD_ERRORS: List[Tuple[str, str]] = []  # (module, error_string)
 
 # IMPORTANT: Only include ops that actually exist in this repo under ops/
-OP_TO_MODULE: Dict[str, str] = {
+# Read-only view: the enabled-op list below is derived from it at import.
+OP_TO_MODULE: Mapping[str, str] = MappingProxyType({
     "echo": "echo",
     "map_tokenize": "map_tokenize",
 
@@ -27,9 +30,11 @@ OP_TO_MODULE: Dict[str, str] = {
     # NOTE: map_summarize exists, but requires torch; keep it mapped
     # only if you build torch into this image. Otherwise don't put it in TASKS.
     "map_summarize": "map_summarize",
-}
+})
+_SORTED_OPS: Tuple[str, ...] = tuple(sorted(OP_TO_MODULE))
 
-_IMPORTED_MODULES: Set[str] = set()
+# op name -> resolved handler, filled by the first successful get_op()
+_OP_CACHE: Dict[str, Callable[..., Any]] = {}
 
 
 def register_op(name: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
@@ -39,8 +44,12 @@ def register_op(name: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]
     return _decorator
 
 
-def _parse_tasks_env() -> Optional[Set[str]]:
-    raw = os.getenv("TASKS", "").strip()
+def _parse_tasks_env() -> Optional[FrozenSet[str]]:
+    return _parse_tasks(os.getenv("TASKS", ""))
+
+
+def _parse_tasks(raw: str) -> Optional[FrozenSet[str]]:
+    raw = raw.strip()
     if not raw:
         return None
 
@@ -52,60 +61,102 @@ def _parse_tasks_env() -> Optional[Set[str]]:
     if "*" in lowered or "all" in lowered:
         return None
     if "none" in lowered:
-        return set()
+        return frozenset()
 
-    return set(parts)
+    return frozenset(parts)
 
 
 def list_ops() -> List[str]:
-    enabled = _parse_tasks_env()
-    if enabled is None:
-        return sorted(OP_TO_MODULE.keys())
-    return sorted([name for name in OP_TO_MODULE.keys() if name in enabled])
+    return list(_ENABLED_LIST)
 
 
 def _is_enabled(name: str) -> bool:
-    enabled = _parse_tasks_env()
-    if enabled is None:
-        return True
-    return name in enabled
+    return _ENABLED_OPS is None or name in _ENABLED_OPS
 
 
 def _import_op_module(module_name: str) -> None:
-    if module_name in _IMPORTED_MODULES:
+    modules = sys.modules
+    if f"ops.{module_name}" in modules:
         return
 
     try:
         importlib.import_module(f"ops.{module_name}")
-        _IMPORTED_MODULES.add(module_name)
     except Exception as e:
         msg = f"{type(e).__name__}: {e}"
         OPS_LOAD_ERRORS.append((module_name, msg))
         print(f"[ops] ERROR: failed to import ops.{module_name}: {msg}", flush=True)
 
 
-def get_op(name: str) -> Callable[..., Any]:
-    if not _is_enabled(name):
-        raise ValueError(f"Op {name!r} is not enabled by TASKS. Enabled ops: {list_ops()}")
+def warmup() -> None:
+    """
+    Import every enabled op module up front, so steady-state get_op() calls
+    never reach importlib. Import failures are recorded in OPS_LOAD_ERRORS.
+    """
+    for name in list_ops():
+        _import_op_module(OP_TO_MODULE[name])
 
-    module = OP_TO_MODULE.get(name)
-    if not module:
-        raise ValueError(f"Unknown op {name!r}. Allowed ops: {sorted(OP_TO_MODULE.keys())}")
 
-    _import_op_module(module)
+def get_op(name: str) -> Callable[..., Any]:
+    fn = _OP_CACHE.get(name)
+    if fn is not None:
+        return fn
 
-    fn = OPS_REGISTRY.get(name)
-    if fn is None:
-        if OPS_LOAD_ERRORS:
-            errs = "; ".join([f"{m} => {e}" for (m, e) in OPS_LOAD_ERRORS[:10]])
-            more = "" if len(OPS_LOAD_ERRORS) <= 10 else f" (+{len(OPS_LOAD_ERRORS)-10} more)"
-            raise ValueError(
-                f"Unknown or failed op {name!r}. Registered ops: {sorted(OPS_REGISTRY.keys())}. "
-                f"Also saw op import errors: {errs}{more}"
-            )
-        raise ValueError(f"Unknown op {name!r}. Registered ops: {sorted(OPS_REGISTRY.keys())}")
+    module = OP_TO_MODULE.get(name) if _is_enabled(name) else None
+    if module:
+        _import_op_module(module)
+        fn = OPS_REGISTRY.get(name)
+        if fn is not None:
+            _OP_CACHE[name] = fn
+            return fn
 
-    return fn
+    # Failure only from here on: message building stays off the lookup path.
+    raise _op_error(name)
 
 
-__all__ = ["OPS_REGISTRY", "OPS_LOAD_ERRORS", "OP_TO_MODULE", "register_op", "list_ops", "get_op"]
+def _op_error(name: str) -> ValueError:
+    if not _is_enabled(name):
+        return ValueError(f"Op {name!r} is not enabled by TASKS. Enabled ops: {list_ops()}")
+
+    if name not in OP_TO_MODULE:
+        return ValueError(f"Unknown op {name!r}. Allowed ops: {list(_SORTED_OPS)}")
+
+    if OPS_LOAD_ERRORS:
+        errs = "; ".join([f"{m} => {e}" for (m, e) in OPS_LOAD_ERRORS[:10]])
+        more = "" if len(OPS_LOAD_ERRORS) <= 10 else f" (+{len(OPS_LOAD_ERRORS)-10} more)"
+        return ValueError(
+            f"Unknown or failed op {name!r}. Registered ops: {sorted(OPS_REGISTRY.keys())}. "
+            f"Also saw op import errors: {errs}{more}"
+        )
+    return ValueError(f"Unknown op {name!r}. Registered ops: {sorted(OPS_REGISTRY.keys())}")
+
+
+# TASKS is read once at import; agents configure it before startup.
+_ENABLED_OPS: Optional[FrozenSet[str]] = _parse_tasks_env()
+_ENABLED_LIST: Tuple[str, ...] = tuple(
+    name for name in _SORTED_OPS if _ENABLED_OPS is None or name in _ENABLED_OPS
+)
+
+
+# Handler symbols reachable as attributes (`from ops import echo_op`); the
+# owning module is imported on first access (PEP 562). Handlers whose name
+# matches their module (risk_accumulate) or is generic (run/handle) are left
+# out: use get_op() for those.
+_LAZY_SYMBOLS: Mapping[str, str] = MappingProxyType({
+    "echo_op": "echo",
+    "map_tokenize_op": "map_tokenize",
+    "op_read_csv_shard": "csv_shard",
+})
+
+
+def __getattr__(name: str) -> Any:
+    module = _LAZY_SYMBOLS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    importlib.import_module(f"ops.{module}")
+    return getattr(sys.modules[f"ops.{module}"], name)
+
+
+__all__ = [
+    "OPS_REGISTRY", "OPS_LOAD_ERRORS", "OP_TO_MODULE", "register_op", "list_ops", "get_op", "warmup",
+    *_LAZY_SYMBOLS,
+]
@@ -4,12 +4,7 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Optional, Tuple
 import os
-
-# Lazy, process-wide cache
-_INTERPRETER = None
-_INPUT_DETAILS = None
-_OUTPUT_DETAILS = None
-_MODEL_PATH = None
+import threading
 
 
 @dataclass(frozen=True)
@@ -19,6 +14,22 @@ class TPUHandle:
     output_details: object
     model_path: str
 
+    # first input/output tensor, resolved once so inference skips dict lookups
+    in_index: int
+    in_shape: Tuple[int, ...]
+    in_dtype: object
+    out_index: int
+    # element count of the input tensor (product of in_shape)
+    in_size: int
+
+
+# Lazy, process-wide cache. A single reference, so readers always see a
+# consistent interpreter/details/model_path triple.
+_CACHED_HANDLE: Optional[TPUHandle] = None
+
+# Serializes interpreter creation; the cached-hit path never takes it.
+_TPU_LOCK = threading.Lock()
+
 
 def get_model_path(requested: Optional[str] = None) -> str:
     """
@@ -36,28 +47,49 @@ def get_tpu_handle(model_path: str) -> TPUHandle:
     Create/reuse a Coral Edge TPU interpreter for the given model_path.
     Imports pycoral only when needed.
     """
-    global _INTERPRETER, _INPUT_DETAILS, _OUTPUT_DETAILS, _MODEL_PATH
+    global _CACHED_HANDLE
 
     # Reuse if same model already loaded
-    if _INTERPRETER is not None and _MODEL_PATH == model_path:
-        return TPUHandle(_INTERPRETER, _INPUT_DETAILS, _OUTPUT_DETAILS, _MODEL_PATH)
+    h = _CACHED_HANDLE
+    if h is not None and h.model_path == model_path:
+        return h
+
+    with _TPU_LOCK:
+        # Another caller may have loaded it while we waited for the lock
+        h = _CACHED_HANDLE
+        if h is not None and h.model_path == model_path:
+            return h
 
-    # Import inside function so agent can still start without pycoral installed
-    from pycoral.utils.edgetpu import list_edge_tpus, make_interpreter
+        # Import inside function so agent can still start without pycoral installed
+        from pycoral.utils.edgetpu import list_edge_tpus, make_interpreter
 
-    tpus = list_edge_tpus()
-    if not tpus:
-        raise RuntimeError("No Edge TPU detected (pycoral list_edge_tpus() returned empty).")
+        tpus = list_edge_tpus()
+        if not tpus:
+            raise RuntimeError("No Edge TPU detected (pycoral list_edge_tpus() returned empty).")
 
-    if not os.path.exists(model_path):
-        raise FileNotFoundError(f"TPU model not found: {model_path}")
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(f"TPU model not found: {model_path}")
 
-    interp = make_interpreter(model_path)
-    interp.allocate_tensors()
+        interp = make_interpreter(model_path)
+        interp.allocate_tensors()
 
-    _INTERPRETER = interp
-    _INPUT_DETAILS = interp.get_input_details()
-    _OUTPUT_DETAILS = interp.get_output_details()
-    _MODEL_PATH = model_path
+        in_details = interp.get_input_details()
+        out_details = interp.get_output_details()
+        in_shape = tuple(int(d) for d in in_details[0]["shape"])
+        in_size = 1
+        for d in in_shape:
+            in_size *= d
 
-    return TPUHandle(_INTERPRETER, _INPUT_DETAILS, _OUTPUT_DETAILS, _MODEL_PATH)
+        h = TPUHandle(
+            interpreter=interp,
+            input_details=in_details,
+            output_details=out_details,
+            model_path=model_path,
+            in_index=int(in_details[0]["index"]),
+            in_shape=in_shape,
+            in_dtype=in_details[0]["dtype"],
+            out_index=int(out_details[0]["index"]),
+            in_size=in_size,
+        )
+        _CACHED_HANDLE = h
+        return h
@@ -1,29 +1,151 @@
 # ops/csv_shard.py
 import csv
-import os
-from typing import Any, Dict, List, Optional
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 from . import register_op
 
 
+def _ragged_row(header: Tuple[str, ...], row: List[str]) -> Dict[str, Any]:
+    """
+    Same shape csv.DictReader produces for rows whose length != header:
+    missing cells become None, extra cells go under the None key.
+    """
+    out: Dict[Any, Any] = dict(zip(header, row))
+    n = len(header)
+    if len(row) > n:
+        out[None] = row[n:]
+    else:
+        for k in header[len(row):]:
+            out[k] = None
+    return out
+
+
+def _read_header(source_uri: str) -> Optional[List[str]]:
+    with open(source_uri, newline="", encoding="utf-8") as f:
+        return next(csv.reader(f), None)
+
+
+def _iter_csv_shard(source_uri: str, start_row: int, shard_size: int) -> Iterator[Dict[str, Any]]:
+    """
+    Yield data rows [start_row, start_row + shard_size) one at a time with the
+    csv module, so internal callers can stream instead of holding the shard.
+    Skipped rows are only tokenized, never turned into dicts; blank lines are
+    not counted, matching csv.DictReader.
+    """
+    with open(source_uri, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return
+        hdr = tuple(header)
+        n = len(hdr)
+        for r in islice(filter(None, reader), start_row, start_row + shard_size):
+            yield dict(zip(hdr, r)) if len(r) == n else _ragged_row(hdr, r)
+
+
+def _arrow_slice(source_uri: str, start_row: int, shard_size: int, read_options: Any = None,
+                 convert_options: Any = None) -> Any:
+    """
+    Stream the CSV through pyarrow's C tokenizer in 1 MiB blocks and return a
+    Table holding data rows [start_row, start_row + shard_size).
+    """
+    # Import inside function so the op still works without pyarrow installed
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+
+    reader = pa_csv.open_csv(
+        source_uri,
+        read_options=read_options or pa_csv.ReadOptions(block_size=1 << 20),
+        parse_options=pa_csv.ParseOptions(newlines_in_values=True),
+        convert_options=convert_options,
+    )
+    skip = start_row
+    need = shard_size
+    batches = []
+    for batch in reader:
+        if skip >= batch.num_rows:
+            skip -= batch.num_rows
+            continue
+        piece = batch.slice(skip, need)
+        skip = 0
+        batches.append(piece)
+        need -= piece.num_rows
+        if need <= 0:
+            break
+
+    return pa.Table.from_batches(batches, schema=reader.schema)
+
+
+def _string_slice(source_uri: str, start_row: int, shard_size: int) -> Optional[Any]:
+    """
+    _arrow_slice with every column as string and named after the csv module's
+    header, or None for a file with no header. pyarrow reads the header record
+    itself: skip_rows counts physical lines, which breaks on a quoted header
+    field containing a newline.
+    """
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+
+    header = _read_header(source_uri)
+    if header is None:
+        return None
+    table = _arrow_slice(
+        source_uri,
+        start_row,
+        shard_size,
+        convert_options=pa_csv.ConvertOptions(column_types={name: pa.string() for name in header}),
+    )
+    if table.column_names != header:
+        raise ValueError("pyarrow header differs from the csv module's")
+    return table
+
+
+def _rows_arrow(source_uri: str, start_row: int, shard_size: int) -> List[Dict[str, Any]]:
+    # Names from the csv module and every column as string, so values are
+    # exactly what csv.DictReader would have produced.
+    table = _string_slice(source_uri, start_row, shard_size)
+    return [] if table is None else table.to_pylist()
+
+
 def _read_csv_shard(source_uri: str, start_row: int, shard_size: int) -> List[Dict[str, Any]]:
     """
     Read a slice of rows from a CSV after the header.
     start_row = 0 means first data row.
+
+    Uses pyarrow when installed; anything it refuses (ragged rows, odd
+    quoting) is re-read with the csv module, which accepts them.
     """
-    rows: List[Dict[str, Any]] = []
-    stop_row = start_row + shard_size
+    try:
+        return _rows_arrow(source_uri, start_row, shard_size)
+    except Exception:
+        pass
+    return list(_iter_csv_shard(source_uri, start_row, shard_size))
 
-    with open(source_uri, newline="", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for idx, row in enumerate(reader):
-            if idx < start_row:
-                continue
-            if idx >= stop_row:
-                break
-            rows.append(row)
 
-    return rows
+def _count_csv_shard(source_uri: str, start_row: int, shard_size: int) -> int:
+    """Row count of the slice _read_csv_shard would return, without building row dicts."""
+    try:
+        table = _string_slice(source_uri, start_row, shard_size)
+        return 0 if table is None else table.num_rows
+    except Exception:
+        pass
+    return sum(1 for _ in _iter_csv_shard(source_uri, start_row, shard_size))
+
+
+def _read_csv_shard_columns(source_uri: str, start_row: int, shard_size: int) -> Dict[str, List[Any]]:
+    """
+    Columnar variant: typed columns inferred by pyarrow, returned as
+    {column: [values...]} for the requested slice. Inferred date, time and
+    timestamp columns come back as ISO strings so the result stays plain JSON.
+    """
+    import pyarrow as pa
+
+    table = _arrow_slice(source_uri, start_row, shard_size)
+    for i, field in enumerate(table.schema):
+        if pa.types.is_temporal(field.type):
+            table = table.set_column(i, field.name, table.column(i).cast(pa.string()))
+    return table.to_pydict()
 
 
 @register_op("read_csv_shard")
@@ -40,7 +162,9 @@ def op_read_csv_shard(task_or_payload: Optional[Dict[str, Any]]) -> Dict[str, An
       - source_uri: str (required)
       - start_row: int (optional, default 0)
       - shard_size: int (optional, default 100)
-      - mode: "rows" | "count" (optional, default "rows")
+      - mode: "rows" | "count" | "arrow" (optional, default "rows")
+        "arrow" returns typed columns {name: [...]} instead of row dicts
+        (requires pyarrow)
     """
     if task_or_payload is None:
         return {"ok": False, "error": "read_csv_shard: missing payload"}
@@ -69,29 +193,52 @@ def op_read_csv_shard(task_or_payload: Optional[Dict[str, Any]]) -> Dict[str, An
         return {"ok": False, "error": "read_csv_shard: shard_size must be > 0"}
 
     mode = payload.get("mode", "rows")
-    if mode not in ("rows", "count"):
-        return {"ok": False, "error": "read_csv_shard: mode must be 'rows' or 'count'"}
-
-    if not os.path.exists(source_uri):
-        return {"ok": False, "error": f"read_csv_shard: file not found: {source_uri}"}
+    if mode not in ("rows", "count", "arrow"):
+        return {"ok": False, "error": "read_csv_shard: mode must be 'rows', 'count' or 'arrow'"}
+
+    if mode == "arrow":
+        try:
+            columns = _read_csv_shard_columns(source_uri, start_row, shard_size)
+        except FileNotFoundError:
+            return {"ok": False, "error": f"read_csv_shard: file not found: {source_uri}"}
+        except ImportError:
+            return {"ok": False, "error": "read_csv_shard: mode 'arrow' requires pyarrow"}
+        except Exception as e:
+            return {"ok": False, "error": f"read_csv_shard: failed reading csv: {type(e).__name__}: {e}"}
+
+        row_count = len(next(iter(columns.values()), []))
+        return {
+            "ok": True,
+            "dataset_id": dataset_id,
+            "mode": "arrow",
+            "start_row": start_row,
+            "end_row": start_row + row_count,
+            "row_count": row_count,
+            "columns": columns,
+        }
 
     try:
-        rows = _read_csv_shard(source_uri, start_row, shard_size)
+        if mode == "count":
+            row_count = _count_csv_shard(source_uri, start_row, shard_size)
+        else:
+            rows = _read_csv_shard(source_uri, start_row, shard_size)
+    except FileNotFoundError:
+        return {"ok": False, "error": f"read_csv_shard: file not found: {source_uri}"}
     except Exception as e:
         return {"ok": False, "error": f"read_csv_shard: failed reading csv: {type(e).__name__}: {e}"}
 
-    end_row = start_row + len(rows)
-
     if mode == "count":
         return {
             "ok": True,
             "dataset_id": dataset_id,
             "mode": "count",
             "start_row": start_row,
-            "end_row": end_row,
-            "row_count": len(rows),
+            "end_row": start_row + row_count,
+            "row_count": row_count,
         }
 
+    end_row = start_row + len(rows)
+
     return {
         "ok": True,
         "dataset_id": dataset_id,
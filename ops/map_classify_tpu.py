@@ -1,24 +1,98 @@
 # ops/map_classify_tpu.py
 from __future__ import annotations
 
-from typing import Dict, Any
-import time
+from typing import Dict, Any, List, Tuple
+from time import perf_counter
+import base64
 
 import numpy as np
 
 from . import register_op
-from ._tpu_runtime import get_model_path, get_tpu_handle
+from ._tpu_runtime import TPUHandle, get_model_path, get_tpu_handle
 
 OP_NAME = "map_classify_tpu"
 
 
 def _topk(scores: np.ndarray, k: int):
-    k = max(1, min(int(k), int(scores.shape[0])))
-    idx = np.argpartition(-scores, k - 1)[:k]
-    idx = idx[np.argsort(-scores[idx])]
+    # scores stay in the model's output dtype (often int8): negating those
+    # would overflow at -128, so select around the k-th largest directly and
+    # only widen the k winners. Quantized scores tie often; ties rank lowest
+    # index first, both for which items make the cut and in the output order.
+    n = int(scores.size)
+    k = max(1, min(int(k), n))
+    if k == n:
+        idx = np.arange(n)
+    else:
+        kth = np.partition(scores, n - k)[n - k]
+        above = np.flatnonzero(scores > kth)
+        idx = np.concatenate((above, np.flatnonzero(scores == kth)[:k - above.size]))
+    idx = idx[np.lexsort((idx, -scores[idx].astype(np.float64)))]
     return [{"index": int(i), "score": float(scores[i])} for i in idx]
 
 
+def _input_array(payload: Dict[str, Any], shape: Tuple[int, ...], dtype: Any, expected: int) -> np.ndarray:
+    """
+    Build the input tensor directly in its final shape.
+
+    "input_b64" (raw tensor bytes, base64) is decoded and viewed in place with
+    np.frombuffer; a flat "input" list is filled in one pass with np.fromiter.
+    """
+    if "input_b64" in payload:
+        raw = base64.b64decode(payload["input_b64"])
+        arr = np.frombuffer(raw, dtype=dtype)
+    elif "input" in payload:
+        inp = payload["input"]
+        if isinstance(inp, list) and len(inp) == expected:
+            try:
+                return np.fromiter(inp, dtype=dtype, count=expected).reshape(shape)
+            except (TypeError, ValueError, OverflowError):
+                pass  # nested, odd or out-of-range values: let np.array sort it out
+        arr = np.array(inp, dtype=dtype)
+    else:
+        raise ValueError('payload missing required key: "input" (or "input_b64")')
+
+    if arr.size != expected:
+        raise ValueError(
+            f"Input size mismatch. Got {arr.size}, expected {expected} for shape {shape}."
+        )
+    return arr.reshape(shape)
+
+
+def _classify_batch(h: TPUHandle, inputs: List[Any], k: int) -> List[Dict[str, Any]]:
+    """
+    Classify many inputs with one handle lookup, filling the model's own batch
+    dimension (shape[0]) per invoke. Edge TPU models are compiled for a fixed
+    input shape, so the tensor is not resized; a short last batch is
+    zero-padded and the padded rows are dropped.
+    """
+    shape = h.in_shape
+    dtype = h.in_dtype
+    batch = int(shape[0]) if shape else 1
+    item_shape = shape[1:]
+    item_size = h.in_size // batch if batch else 0
+
+    results: List[Dict[str, Any]] = []
+    for start in range(0, len(inputs), batch):
+        chunk = inputs[start:start + batch]
+        arr = np.zeros(shape, dtype=dtype)
+        for j, x in enumerate(chunk):
+            a = np.asarray(x, dtype=dtype)
+            if a.size != item_size:
+                raise ValueError(
+                    f"inputs[{start + j}] size mismatch. Got {a.size}, expected {item_size} for shape {item_shape}."
+                )
+            arr[j] = a.reshape(item_shape)
+
+        h.interpreter.set_tensor(h.in_index, arr)
+        h.interpreter.invoke()
+
+        out = h.interpreter.get_tensor(h.out_index).reshape(batch, -1)
+        for j in range(len(chunk)):
+            results.append({"topk": _topk(out[j], k)})
+
+    return results
+
+
 def _cpu_fallback(payload: Dict[str, Any]) -> Dict[str, Any]:
     return {
         "op": OP_NAME,
@@ -36,55 +110,51 @@ def run(payload: Dict[str, Any], ctx: Dict[str, Any] = None) -> Dict[str, Any]:
     Uses:
       - payload["model_path"] OR env TPU_MODEL_PATH OR /models/model_edgetpu.tflite
       - payload["topk"] default 5
-      - payload["input"] required (flat list[int] of int8 values)
+      - payload["input"] flat list[int] of int8 values, or
+        payload["input_b64"] base64 of the raw input tensor bytes, or
+        payload["inputs"] list of flat inputs -> "results": [{"topk": [...]}, ...]
       - payload["allow_fallback"] default True
     """
     ctx = ctx or {}
     payload = payload or {}
 
-    t0 = time.time()
+    t0 = perf_counter()
     allow_fallback = payload.get("allow_fallback", True)
 
     try:
         model_path = get_model_path(payload.get("model_path"))
         h = get_tpu_handle(model_path)
 
-        if "input" not in payload:
-            raise ValueError('payload missing required key: "input"')
-
-        input_details = h.input_details[0]
-        out_details = h.output_details[0]
-
-        shape = tuple(input_details["shape"])
-        dtype = input_details["dtype"]
+        k = int(payload.get("topk", 5))
 
-        arr = np.array(payload["input"], dtype=dtype)
-
-        expected = int(np.prod(shape))
-        if arr.size != expected:
-            raise ValueError(
-                f"Input size mismatch. Got {arr.size}, expected {expected} for shape {shape}."
-            )
+        if isinstance(payload.get("inputs"), list):
+            results = _classify_batch(h, payload["inputs"], k)
+            return {
+                "op": OP_NAME,
+                "model_path": h.model_path,
+                "results": results,
+                "elapsed_ms": (perf_counter() - t0) * 1000.0,
+            }
 
-        arr = arr.reshape(shape)
+        arr = _input_array(payload, h.in_shape, h.in_dtype, h.in_size)
 
-        h.interpreter.set_tensor(input_details["index"], arr)
+        h.interpreter.set_tensor(h.in_index, arr)
         h.interpreter.invoke()
 
-        out = h.interpreter.get_tensor(out_details["index"]).flatten().astype("float32")
-        topk = _topk(out, int(payload.get("topk", 5)))
+        out = h.interpreter.get_tensor(h.out_index).ravel()
+        topk = _topk(out, k)
 
         return {
             "op": OP_NAME,
             "model_path": h.model_path,
             "topk": topk,
-            "elapsed_ms": (time.time() - t0) * 1000.0,
+            "elapsed_ms": (perf_counter() - t0) * 1000.0,
         }
 
     except Exception as e:
         if allow_fallback:
             return {
                 **_cpu_fallback({"fallback_reason": str(e), **payload}),
-                "elapsed_ms": (time.time() - t0) * 1000.0,
+                "elapsed_ms": (perf_counter() - t0) * 1000.0,
             }
         raise
@@ -1,68 +1,276 @@
 # ops/map_summarize.py
+import functools
 import os
 import threading
-from typing import Any, Dict, Optional
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
 import torch
-from transformers import BartTokenizer, BartForConditionalGeneration
+from transformers import BartTokenizerFast, BartForConditionalGeneration
+from transformers.utils import is_accelerate_available
 from . import register_op
 
 MODEL_NAME = os.getenv("BART_MODEL", "facebook/bart-large-cnn")
 FORCE_CPU = os.getenv("SUMMARIZE_FORCE_CPU", "1").strip() in ("1", "true", "yes")
 
+# Micro-batching: concurrent callers are coalesced into one generate() call.
+BATCH_MAX = max(1, int(os.getenv("SUMMARIZE_BATCH_MAX", "16")))
+BATCH_WAIT_SEC = max(0.0, float(os.getenv("SUMMARIZE_BATCH_WAIT_MS", "10")) / 1000.0)
+
+# Optional fused CPU kernels: "bettertransformer" (optimum) or "ipex"
+# (intel_extension_for_pytorch). Empty = plain PyTorch.
+CPU_ACCEL = os.getenv("SUMMARIZE_CPU_ACCEL", "").strip().lower()
+
+# "torch" (default) or "onnx": ONNX Runtime via optimum, falling back to
+# torch if optimum/onnxruntime are missing or the export fails.
+BACKEND = os.getenv("SUMMARIZE_BACKEND", "torch").strip().lower()
+
 _lock = threading.Lock()
-_model = None
-_tokenizer = None
-_device = "cpu"
-
-def _init_model():
-    global _model, _tokenizer, _device
-    if _model is not None:
-        return
-    
+
+
+@functools.cache
+def _load_model() -> Tuple[Any, Any, str]:
+    device = "cpu" if FORCE_CPU else ("cuda" if torch.cuda.is_available() else "cpu")
+
+    # Rust tokenizers backend; 1024 is BART's position limit, set so
+    # truncation never has to warn or look it up per call.
+    tokenizer = BartTokenizerFast.from_pretrained(MODEL_NAME, model_max_length=1024)
+
+    if BACKEND == "onnx":
+        model = _load_onnx(device)
+        if model is not None:
+            return model, tokenizer, device
+
+    # Weights load in their final dtype (fp32 stays on CPU, where fp16 matmuls
+    # are slow). With accelerate installed, the skeleton is also built on the
+    # meta device and filled straight from the checkpoint: no throwaway fp32
+    # init, no second copy. transformers refuses low_cpu_mem_usage without it.
+    model = BartForConditionalGeneration.from_pretrained(
+        MODEL_NAME,
+        torch_dtype=torch.float16 if device == "cuda" else torch.float32,
+        low_cpu_mem_usage=is_accelerate_available(),
+    )
+    model.to(device)
+    model.eval()
+    if device == "cpu" and CPU_ACCEL:
+        model = _accelerate_cpu(model)
+    return model, tokenizer, device
+
+
+def _load_onnx(device: str) -> Optional[Any]:
+    # Import inside function so the torch path works without optimum installed.
+    # ORTModelForSeq2SeqLM keeps HF's generate() API; the merged decoder with
+    # past_key_values avoids a second decoder graph, and on CUDA the ORT model
+    # binds inputs/outputs on device (IOBinding) across decoder steps.
+    try:
+        from optimum.onnxruntime import ORTModelForSeq2SeqLM
+        return ORTModelForSeq2SeqLM.from_pretrained(
+            MODEL_NAME,
+            export=True,
+            use_cache=True,
+            use_merged=True,
+            provider="CUDAExecutionProvider" if device == "cuda" else "CPUExecutionProvider",
+        )
+    except Exception as e:
+        print(f"[map_summarize] WARNING: onnx backend unavailable ({type(e).__name__}: {e}); using PyTorch", flush=True)
+        return None
+
+
+def _accelerate_cpu(model: Any) -> Any:
+    # Imports inside function so the op still loads without optimum/ipex;
+    # if the backend is missing or rejects the model, keep the plain model.
+    try:
+        if CPU_ACCEL == "bettertransformer":
+            from optimum.bettertransformer import BetterTransformer
+            return BetterTransformer.transform(model, keep_original_model=False)
+        if CPU_ACCEL == "ipex":
+            import intel_extension_for_pytorch as ipex
+            return ipex.optimize(model)
+        print(f"[map_summarize] WARNING: unknown SUMMARIZE_CPU_ACCEL={CPU_ACCEL!r}; using plain PyTorch", flush=True)
+    except Exception as e:
+        print(f"[map_summarize] WARNING: {CPU_ACCEL} unavailable ({type(e).__name__}: {e}); using plain PyTorch", flush=True)
+    return model
+
+
+@functools.cache
+def _get_model() -> Tuple[Any, Any, str]:
+    """(model, tokenizer, device); after the first call this is a C-level cache hit."""
+    # functools.cache doesn't stop two first callers both missing; the lock
+    # makes the loser take _load_model's cached result instead of reloading.
     with _lock:
-        if _model is not None:
-            return
-        
-        device = "cpu" if FORCE_CPU else ("cuda" if torch.cuda.is_available() else "cpu")
-        print(f"[map_summarize CPU] Loading BART on {device}", flush=True)
-        
-        _tokenizer = BartTokenizer.from_pretrained(MODEL_NAME)
-        _model = BartForConditionalGeneration.from_pretrained(MODEL_NAME)
-        _model.to(device)
-        _model.eval()
-        _device = device
+        return _load_model()
+
+
+def _summarize_batch(texts: List[str], max_length: int, min_length: int) -> List[str]:
+    model, tokenizer, device = _get_model()
+    enc = tokenizer(texts, padding=True, truncation=True, max_length=1024, return_tensors="pt").to(device)
+
+    # Beam settings match bart-large-cnn's own generation config, spelled out
+    # so other BART checkpoints summarize the same way. use_cache keeps the
+    # decoder past_key_values across beam steps; inference_mode also skips
+    # autograd's view/version tracking. Sampling and beam groups are pinned
+    # off so a checkpoint config can't route generate() to a slower search.
+    with torch.inference_mode():
+        summary_ids = model.generate(
+            input_ids=enc["input_ids"],
+            attention_mask=enc["attention_mask"],
+            max_length=max_length,
+            min_length=min_length,
+            num_beams=4,
+            num_beam_groups=1,
+            do_sample=False,
+            early_stopping=True,
+            no_repeat_ngram_size=3,
+            length_penalty=2.0,
+            use_cache=True,
+        )
+
+    return tokenizer.batch_decode(summary_ids, skip_special_tokens=True)
+
+
+class _Slot:
+    """One queued text; the worker fills summary/error and sets done."""
+
+    __slots__ = ("text", "key", "done", "summary", "error")
+
+    def __init__(self, text: str, key: Tuple[int, int]):
+        self.text = text
+        self.key = key
+        self.done = threading.Event()
+        self.summary: Optional[str] = None
+        self.error: Optional[BaseException] = None
+
+
+class _BatchQueue:
+    """
+    Coalesces texts from concurrent callers. While more than one caller is
+    active the worker waits up to BATCH_WAIT_SEC for a batch to fill (a lone
+    caller has nobody to wait for), then runs every queued slot sharing
+    the head's (max_length, min_length) through one generate() call, so each
+    text is summarized with exactly the lengths its caller asked for.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._items: Deque[_Slot] = deque()
+        self._worker: Optional[threading.Thread] = None
+        self._callers = 0
+
+    def submit(self, slots: List[_Slot]) -> None:
+        with self._cond:
+            self._callers += 1
+            self._items.extend(slots)
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="map_summarize-batch", daemon=True)
+                self._worker.start()
+            self._cond.notify()
+
+    def release(self) -> None:
+        """Called by a submitter once all of its slots are done."""
+        with self._cond:
+            self._callers -= 1
+
+    def _take(self) -> List[_Slot]:
+        with self._cond:
+            while not self._items:
+                self._cond.wait()
+
+            deadline = time.monotonic() + BATCH_WAIT_SEC
+            while self._callers > 1 and len(self._items) < BATCH_MAX:
+                left = deadline - time.monotonic()
+                if left <= 0:
+                    break
+                self._cond.wait(left)
+
+            key = self._items[0].key
+            batch: List[_Slot] = []
+            rest: Deque[_Slot] = deque()
+            while self._items:
+                s = self._items.popleft()
+                if s.key == key and len(batch) < BATCH_MAX:
+                    batch.append(s)
+                else:
+                    rest.append(s)
+            self._items = rest
+            return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._take()
+            try:
+                max_length, min_length = batch[0].key
+                summaries = _summarize_batch([s.text for s in batch], max_length, min_length)
+                for s, summary in zip(batch, summaries):
+                    s.summary = summary
+            except BaseException as e:
+                for s in batch:
+                    s.error = e
+            finally:
+                for s in batch:
+                    s.done.set()
+
+
+_queue = _BatchQueue()
+
+
+def _summarize(texts: List[str], max_length: int, min_length: int) -> List[str]:
+    key = (max_length, min_length)
+    slots = [_Slot(t, key) for t in texts]
+    _queue.submit(slots)
+    try:
+        for s in slots:
+            s.done.wait()
+    finally:
+        _queue.release()
+
+    out: List[str] = []
+    for s in slots:
+        if s.error is not None:
+            raise s.error
+        out.append(s.summary)
+    return out
+
 
 @register_op("map_summarize")
 def handle(payload: Optional[Dict[str, Any]]) -> Dict[str, Any]:
-    _init_model()
-    
+    """
+    Payload:
+      - text: str, or texts: list[str] -> "summaries" in the same order
+      - max_length: int (default 130)
+      - min_length: int (default 30)
+    """
+    device = _get_model()[2]
+
     if not payload:
         return {"ok": False, "error": "empty payload"}
-    
+
+    max_length = int(payload.get("max_length", 130))
+    min_length = int(payload.get("min_length", 30))
+
+    texts = payload.get("texts")
+    if texts is not None:
+        if not isinstance(texts, list) or not texts:
+            return {"ok": False, "error": "texts must be a non-empty list"}
+        texts = [t.strip() if isinstance(t, str) else "" for t in texts]
+        if not all(texts):
+            return {"ok": False, "error": "texts must all be non-empty strings"}
+
+        return {
+            "ok": True,
+            "summaries": _summarize(texts, max_length, min_length),
+            "device": device,
+            "model": MODEL_NAME
+        }
+
     text = payload.get("text", "").strip()
     if not text:
         return {"ok": False, "error": "no text provided"}
-    
-    max_length = int(payload.get("max_length", 130))
-    min_length = int(payload.get("min_length", 30))
-    
-    inputs = _tokenizer([text], max_length=1024, truncation=True, return_tensors="pt")
-    inputs = {k: v.to(_device) for k, v in inputs.items()}
-    
-    with torch.no_grad():
-        summary_ids = _model.generate(
-            inputs["input_ids"],
-            max_length=max_length,
-            min_length=min_length,
-            num_beams=4,
-            early_stopping=True
-        )
-    
-    summary = _tokenizer.decode(summary_ids[0], skip_special_tokens=True)
-    
+
+    summary = _summarize([text], max_length, min_length)[0]
+
     return {
         "ok": True,
         "summary": summary,
-        "device": _device,
+        "device": device,
         "model": MODEL_NAME
     }
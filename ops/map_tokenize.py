@@ -1,12 +1,19 @@
 # ops/map_tokenize.py
-from typing import Dict, Any, List, Union
+from itertools import chain
+from typing import Dict, Any, Iterator, List, Union
 from . import register_op
 
 
+def _iter_chunks(text: str, chunk_size: int) -> Iterator[str]:
+    # Slices built by map() over slice objects: no per-chunk bytecode.
+    n = len(text)
+    return map(text.__getitem__, map(slice, range(0, n, chunk_size), range(chunk_size, n + chunk_size, chunk_size)))
+
+
 def _chunk_text(text: str, chunk_size: int) -> List[str]:
     if not text:
         return []
-    return [text[i:i + chunk_size] for i in range(0, len(text), chunk_size)]
+    return list(_iter_chunks(text, chunk_size))
 
 
 @register_op("map_tokenize")
@@ -31,13 +38,9 @@ def map_tokenize_op(payload: Dict[str, Any]) -> Dict[str, Any]:
         if not isinstance(items, list):
             return {"ok": False, "error": "payload.items must be a list of strings"}
 
-        all_chunks: List[str] = []
-        total_chars = 0
-
-        for x in items:
-            s = "" if x is None else str(x)
-            total_chars += len(s)
-            all_chunks.extend(_chunk_text(s, chunk_size))
+        texts = ["" if x is None else str(x) for x in items]
+        total_chars = sum(map(len, texts))
+        all_chunks: List[str] = list(chain.from_iterable(_iter_chunks(s, chunk_size) for s in texts))
 
         return {
             "ok": True,
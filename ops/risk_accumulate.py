@@ -4,6 +4,8 @@ from __future__ import annotations
 import time
 from typing import Any, Dict, List
 
+import numpy as np
+
 from . import register_op
 
 
@@ -15,6 +17,20 @@ def _to_float(x: Any) -> float:
     raise ValueError("value must be numeric")
 
 
+def _to_array(raw: List[Any]) -> np.ndarray:
+    # All-numeric lists convert in C. Anything else (numeric strings, None,
+    # nested lists, ints too wide for int64) lands in a str/object array or
+    # fails to convert, and goes through _to_float, which accepts strings and
+    # raises the validation error for the rest.
+    try:
+        arr = np.asarray(raw)
+    except (TypeError, ValueError):
+        arr = None
+    if arr is not None and arr.ndim == 1 and arr.dtype.kind in "biuf":
+        return arr.astype(np.float64, copy=False)
+    return np.fromiter(map(_to_float, raw), dtype=np.float64, count=len(raw))
+
+
 @register_op("risk_accumulate")
 def risk_accumulate(payload: Dict[str, Any]) -> Dict[str, Any]:
     """
@@ -25,17 +41,16 @@ def risk_accumulate(payload: Dict[str, Any]) -> Dict[str, Any]:
       B) {"items":[{"risk":...}, ...], "field":"risk"} (field optional, defaults 'risk')
 
     Returns:
-      - count, sum, mean, min, max
+      - count, sum, mean, min, max (min/max skip NaN values; sum/mean don't)
     """
     start = time.time()
 
-    values: List[float] = []
+    raw: List[Any] = []
 
     if "values" in payload:
         raw = payload.get("values")
         if not isinstance(raw, list):
             raise ValueError("payload.values must be a list")
-        values = [_to_float(v) for v in raw]
 
     elif "items" in payload:
         items = payload.get("items")
@@ -47,12 +62,12 @@ def risk_accumulate(payload: Dict[str, Any]) -> Dict[str, Any]:
                 raise ValueError("payload.items must contain dict objects")
             if field not in it:
                 continue
-            values.append(_to_float(it[field]))
+            raw.append(it[field])
 
     else:
         raise ValueError("payload must include either 'values' or 'items'")
 
-    if not values:
+    if not raw:
         return {
             "count": 0,
             "sum": 0.0,
@@ -62,13 +77,14 @@ def risk_accumulate(payload: Dict[str, Any]) -> Dict[str, Any]:
             "compute_time_ms": (time.time() - start) * 1000.0,
         }
 
-    total = sum(values)
-    mn = min(values)
-    mx = max(values)
-    mean = total / len(values)
+    values = _to_array(raw)
+    total = float(values.sum())
+    mn = float(np.nanmin(values))
+    mx = float(np.nanmax(values))
+    mean = total / values.size
 
     return {
-        "count": len(values),
+        "count": int(values.size),
         "sum": total,
         "mean": mean,
         "min": mn,
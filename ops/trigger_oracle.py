@@ -1,11 +1,27 @@
 # ops/trigger_oracle.py
 import requests
 import os
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # Oracle Configuration
 ORACLE_HOST = os.environ.get("ORACLE_HOST", "https://eg-dev.fa.us2.oraclecloud.com")
 ORACLE_AUTH = (os.environ.get("ORA_USER"), os.environ.get("ORA_PASS"))
 
+# Keep-alive session shared by every call: one TCP/TLS handshake per pooled
+# connection instead of per request. Retry only covers failed connects (POST
+# is not in Retry's allowed_methods), so a transaction is never sent twice.
+_session = requests.Session()
+_adapter = HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=64,
+    max_retries=Retry(total=3, backoff_factor=0.2),
+)
+_session.mount("http://", _adapter)
+_session.mount("https://", _adapter)
+_session.auth = ORACLE_AUTH
+_session.headers.update({"Content-Type": "application/vnd.oracle.adf.resourceitem+json"})
+
 def run(payload):
     """
     Expects payload: {"event": "InventoryUpdate", "item": "A544", "qty": -1}
@@ -21,10 +37,8 @@ def run(payload):
             "TransactionDate": "2026-01-04T12:00:00Z"
         }
         
-        headers = {"Content-Type": "application/vnd.oracle.adf.resourceitem+json"}
-
         # Fire the signal
-        response = requests.post(endpoint, json=oracle_payload, headers=headers, auth=ORACLE_AUTH)
+        response = _session.post(endpoint, json=oracle_payload)
 
         if response.status_code == 201:
             return {"status": "success", "oracle_tx_id": response.json()['TransactionId']}
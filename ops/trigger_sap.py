@@ -1,11 +1,26 @@
 # ops/trigger_sap.py
 import requests
 import os
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # SAP Configuration (In production, load these from secure Env Vars)
 SAP_HOST = os.environ.get("SAP_HOST", "https://my-sap-instance.com")
 SAP_AUTH = (os.environ.get("SAP_USER"), os.environ.get("SAP_PASS"))
 
+# Keep-alive session shared by every call: one TCP/TLS handshake per pooled
+# connection instead of per request. Retry only covers failed connects (POST
+# is not in Retry's allowed_methods), so a transaction is never sent twice.
+_session = requests.Session()
+_adapter = HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=64,
+    max_retries=Retry(total=3, backoff_factor=0.2),
+)
+_session.mount("http://", _adapter)
+_session.mount("https://", _adapter)
+_session.auth = SAP_AUTH
+
 def run(payload):
     """
     Expects payload: {"event_type": "QualityIssue", "material": "PART-123", "text": "Crack detected"}
@@ -22,7 +37,7 @@ def run(payload):
         }
 
         # Fire the signal
-        response = requests.post(endpoint, json=sap_payload, auth=SAP_AUTH)
+        response = _session.post(endpoint, json=sap_payload)
         
         if response.status_code == 201:
             return {"status": "success", "sap_id": response.json()['d']['Notification']}
@@ -0,0 +1,87 @@
+import csv
+import json
+
+import pytest
+
+from ops import csv_shard
+from ops.csv_shard import op_read_csv_shard
+
+
+def _write(tmp_path, text):
+    path = tmp_path / "data.csv"
+    path.write_text(text, encoding="utf-8", newline="")
+    return str(path)
+
+
+def _dictreader_rows(path, start, size):
+    with open(path, newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))[start:start + size]
+
+
+def test_rows_header_with_newline_matches_dictreader(tmp_path):
+    pytest.importorskip("pyarrow")
+    path = _write(tmp_path, '"a\nx",b\n1,2\n3,4\n')
+
+    out = op_read_csv_shard({"source_uri": path, "start_row": 0, "shard_size": 10})
+
+    assert out["ok"]
+    assert out["rows"] == _dictreader_rows(path, 0, 10)
+    assert out["rows"] == [{"a\nx": "1", "b": "2"}, {"a\nx": "3", "b": "4"}]
+
+
+def test_rows_offset_header_with_newline(tmp_path):
+    pytest.importorskip("pyarrow")
+    path = _write(tmp_path, '"a\nx",b\n1,2\n3,4\n')
+
+    out = op_read_csv_shard({"source_uri": path, "start_row": 1, "shard_size": 10})
+
+    assert out["rows"] == [{"a\nx": "3", "b": "4"}]
+    assert (out["start_row"], out["end_row"]) == (1, 2)
+
+
+def test_count_does_not_build_rows(tmp_path, monkeypatch):
+    path = _write(tmp_path, '"a\nx",b\n1,2\n3,4\n\n5,6\n')
+
+    def _no_rows(*args, **kwargs):
+        raise AssertionError("count mode built row dicts")
+
+    monkeypatch.setattr(csv_shard, "_read_csv_shard", _no_rows)
+    out = op_read_csv_shard({"source_uri": path, "mode": "count", "start_row": 1, "shard_size": 10})
+
+    assert out["ok"]
+    assert out["row_count"] == 2
+    assert out["end_row"] == 3
+
+
+def test_count_falls_back_to_csv_module(tmp_path, monkeypatch):
+    path = _write(tmp_path, "a,b\n1,2\n3\n4,5,6\n")
+
+    def _no_arrow(*args, **kwargs):
+        raise ImportError("pyarrow")
+
+    monkeypatch.setattr(csv_shard, "_string_slice", _no_arrow)
+    out = op_read_csv_shard({"source_uri": path, "mode": "count"})
+
+    assert out["row_count"] == 3
+
+
+def test_count_missing_file(tmp_path):
+    out = op_read_csv_shard({"source_uri": str(tmp_path / "nope.csv"), "mode": "count"})
+
+    assert not out["ok"]
+    assert "file not found" in out["error"]
+
+
+def test_arrow_mode_date_columns_are_json_strings(tmp_path):
+    pytest.importorskip("pyarrow")
+    path = _write(tmp_path, "d,ts,n\n2024-01-02,2024-01-02T03:04:05,1\n2024-02-03,2024-02-03T00:00:00,2\n")
+
+    out = op_read_csv_shard({"source_uri": path, "mode": "arrow"})
+
+    assert out["ok"]
+    json.dumps(out)
+    assert out["columns"] == {
+        "d": ["2024-01-02", "2024-02-03"],
+        "ts": ["2024-01-02 03:04:05", "2024-02-03 00:00:00"],
+        "n": [1, 2],
+    }
@@ -0,0 +1,82 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from ops import map_classify_tpu
+from ops._tpu_runtime import TPUHandle
+
+
+class _FakeInterpreter:
+    def __init__(self, output):
+        self.output = output
+        self.input = None
+
+    def set_tensor(self, index, arr):
+        self.input = arr
+
+    def invoke(self):
+        pass
+
+    def get_tensor(self, index):
+        return self.output
+
+
+def _handle(output, shape=(1, 4), dtype=np.int8):
+    return TPUHandle(
+        interpreter=_FakeInterpreter(output),
+        input_details=None,
+        output_details=None,
+        model_path="fake.tflite",
+        in_index=0,
+        in_shape=shape,
+        in_dtype=dtype,
+        out_index=0,
+        in_size=int(np.prod(shape)),
+    )
+
+
+def test_out_of_range_input_is_handled(monkeypatch):
+    h = _handle(np.array([1, 2, 3], dtype=np.uint8))
+    monkeypatch.setattr(map_classify_tpu, "get_tpu_handle", lambda path: h)
+
+    out = map_classify_tpu.run({"input": [200, 0, 0, 0], "topk": 1})
+
+    # numpy < 2 wraps the value and classifies; numpy >= 2 refuses it and
+    # the op returns its handled fallback. Either way, no raw traceback.
+    assert out["op"] == "map_classify_tpu"
+    assert "topk" in out
+
+
+def test_out_of_range_input_without_fallback_raises_from_np_array(monkeypatch):
+    h = _handle(np.array([1, 2, 3], dtype=np.uint8))
+    monkeypatch.setattr(map_classify_tpu, "get_tpu_handle", lambda path: h)
+    calls = []
+    real_array = np.array
+
+    def _array(*args, **kwargs):
+        calls.append(args)
+        return real_array(*args, **kwargs)
+
+    monkeypatch.setattr(map_classify_tpu.np, "array", _array)
+    try:
+        map_classify_tpu.run({"input": [200, 0, 0, 0], "allow_fallback": False})
+    except OverflowError:
+        pass
+
+    assert calls, "np.fromiter's OverflowError did not reach the np.array path"
+
+
+@pytest.mark.parametrize("k, expected", [(1, [1]), (3, [1, 3, 0]), (5, [1, 3, 0, 2, 4])])
+def test_topk_ties_rank_lowest_index_first(k, expected):
+    scores = np.array([5, 9, 5, 9, 5], dtype=np.uint8)
+
+    assert [r["index"] for r in map_classify_tpu._topk(scores, k)] == expected
+
+
+def test_topk_int8_extremes():
+    scores = np.array([-128, 127, -128, 0], dtype=np.int8)
+
+    out = map_classify_tpu._topk(scores, 4)
+
+    assert [r["index"] for r in out] == [1, 3, 0, 2]
+    assert [r["score"] for r in out] == [127.0, 0.0, -128.0, -128.0]
@@ -0,0 +1,34 @@
+import math
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from ops.risk_accumulate import risk_accumulate
+
+
+def test_numeric_values():
+    out = risk_accumulate({"values": [1, 2.5, True, 2 ** 70]})
+
+    assert out["count"] == 4
+    assert out["min"] == 1.0
+    assert out["max"] == float(2 ** 70)
+
+
+def test_numeric_strings_are_accepted():
+    out = risk_accumulate({"items": [{"risk": " 1.5 "}, {"risk": 3}, {"other": 9}]})
+
+    assert (out["count"], out["sum"], out["min"], out["max"]) == (2, 4.5, 1.5, 3.0)
+
+
+@pytest.mark.parametrize("bad", [[1, None], [[1, 2]], [1, [2]], [b"1"], [{}]])
+def test_non_numeric_values_raise(bad):
+    with pytest.raises(ValueError, match="value must be numeric"):
+        risk_accumulate({"values": bad})
+
+
+def test_min_max_skip_nan():
+    out = risk_accumulate({"values": [float("nan"), 4.0, 2.0]})
+
+    assert math.isnan(out["sum"])
+    assert (out["min"], out["max"]) == (2.0, 4.0)
@@ -1,7 +1,19 @@
 import os
+import copy
+import csv
+import functools
+import glob
+import importlib.util
 import math
+import platform
 import subprocess
-from typing import Dict, Any, List, Optional
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, replace
+from typing import Deque, Dict, Any, List, Optional, Tuple
 
 try:
     import psutil
@@ -9,8 +21,14 @@ except ImportError:
     psutil = None
 
 
+# One copy of the environment, taken at import: sizing reads a plain dict
+# instead of going through os.environ per lookup. _env_cache_clear() retakes it.
+_ENV: Dict[str, str] = dict(os.environ)
+
+
+@functools.lru_cache(maxsize=128)
 def _env_int(name: str, default: int) -> int:
-    v = os.getenv(name)
+    v = _ENV.get(name)
     if v is None or str(v).strip() == "":
         return default
     try:
@@ -19,8 +37,21 @@ def _env_int(name: str, default: int) -> int:
         return default
 
 
+@functools.lru_cache(maxsize=128)
+def _env_opt_int(name: str) -> Optional[int]:
+    """Like _env_int, but None when unset/blank/invalid so callers can tell "0" from "not set"."""
+    v = _ENV.get(name)
+    if v is None or str(v).strip() == "":
+        return None
+    try:
+        return int(str(v).strip())
+    except Exception:
+        return None
+
+
+@functools.lru_cache(maxsize=128)
 def _env_float(name: str, default: float) -> float:
-    v = os.getenv(name)
+    v = _ENV.get(name)
     if v is None or str(v).strip() == "":
         return default
     try:
@@ -29,8 +60,9 @@ def _env_float(name: str, default: float) -> float:
         return default
 
 
+@functools.lru_cache(maxsize=128)
 def _env_bool(name: str, default: bool = False) -> bool:
-    v = os.getenv(name)
+    v = _ENV.get(name)
     if v is None:
         return default
     s = str(v).strip().lower()
@@ -41,6 +73,172 @@ def _env_bool(name: str, default: bool = False) -> bool:
     return default
 
 
+def _env_cache_clear() -> None:
+    """Re-snapshot the environment and forget memoized env values."""
+    global _ENV
+    _ENV = dict(os.environ)
+    _env_int.cache_clear()
+    _env_opt_int.cache_clear()
+    _env_float.cache_clear()
+    _env_bool.cache_clear()
+    _per_worker_bytes_estimate.cache_clear()
+
+
+def _cpu_count() -> int:
+    """
+    CPUs this process may run on. sched_getaffinity honours cpusets/taskset
+    (os.cpu_count and psutil report the whole host); psutil is only a
+    fallback where affinity isn't available (non-Linux).
+    """
+    try:
+        return len(os.sched_getaffinity(0)) or 1
+    except (AttributeError, OSError):
+        pass
+    return (psutil.cpu_count(logical=True) if psutil is not None else None) or os.cpu_count() or 1
+
+
+def cgroup_cpu_limit() -> Optional[float]:
+    """
+    CPU quota in cores (may be fractional) from cgroup v2 cpu.max ("quota
+    period") or v1 cfs_quota_us/cfs_period_us. None if unlimited or unknown.
+    Shared with app.py's cpu_util sampling.
+    """
+    try:
+        with open("/sys/fs/cgroup/cpu.max", "r", encoding="utf-8") as f:
+            parts = f.readline().split()
+    except OSError:
+        parts = []
+
+    if parts:
+        if len(parts) != 2 or parts[0] == "max":
+            return None
+        quota, period = parts
+    else:
+        try:
+            with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us", "r", encoding="utf-8") as f:
+                quota = f.readline()
+            with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us", "r", encoding="utf-8") as f:
+                period = f.readline()
+        except OSError:
+            return None
+
+    try:
+        q, p = int(quota), int(period)
+    except ValueError:
+        return None
+    if q <= 0 or p <= 0:  # v1 reports -1 for "no limit"
+        return None
+    return q / p
+
+
+def _mem_available_bytes() -> Optional[int]:
+    """MemAvailable from /proc/meminfo; psutil only off Linux. None if unknown."""
+    try:
+        with open("/proc/meminfo", "rb") as f:
+            for line in f:
+                if line.startswith(b"MemAvailable:"):
+                    return int(line.split()[1]) * 1024  # kB
+    except (OSError, ValueError, IndexError):
+        pass
+    if psutil is not None:
+        try:
+            return int(getattr(psutil.virtual_memory(), "available", 0) or 0) or None
+        except Exception:
+            pass
+    return None
+
+
+@functools.lru_cache(maxsize=1)
+def _per_worker_bytes_estimate() -> int:
+    """
+    Marginal memory per worker thread, by C allocator:
+      - glibc gives each new thread its own malloc arena (64 MiB reserved on
+        64-bit) until MALLOC_ARENA_MAX caps the arena count;
+      - with MALLOC_ARENA_MAX set, threads share arenas, leaving stack +
+        Python overhead (the old flat 32 MiB budget);
+      - musl has no per-thread arenas, so a thread costs little (2 MiB);
+      - anything else (non-Linux, unknown libc) keeps 32 MiB.
+    """
+    libc = platform.libc_ver()[0]
+    if libc == "glibc":
+        arena_max = _env_int("MALLOC_ARENA_MAX", 0)
+        return 32 * 1024 * 1024 if arena_max > 0 else 64 * 1024 * 1024
+    if sys.platform.startswith("linux") and not libc:
+        # libc_ver() can't identify musl; a glibc-less Linux is almost always it
+        return 2 * 1024 * 1024
+    return 32 * 1024 * 1024
+
+
+# Reading PSS makes the kernel walk every mapping, so refresh at most every 30s.
+_PSS_TTL_SEC = 30.0
+_PSS_CACHE: Dict[str, Any] = {"ts": 0.0, "value": None}
+
+
+def _pss_per_thread_bytes() -> Optional[int]:
+    """
+    This process's proportional set size divided by its live threads: the
+    observed footprint per worker, where the arena estimate is only a guess.
+    Read from /proc/self/smaps_rollup (psutil as fallback); None where PSS
+    isn't available.
+    """
+    now = time.monotonic()
+    if _PSS_CACHE["ts"] and now - _PSS_CACHE["ts"] < _PSS_TTL_SEC:
+        return _PSS_CACHE["value"]
+
+    pss = 0
+    try:
+        with open("/proc/self/smaps_rollup", "rb") as f:
+            for line in f:
+                if line.startswith(b"Pss:"):
+                    pss = int(line.split()[1]) * 1024  # kB
+                    break
+    except (OSError, ValueError, IndexError):
+        if psutil is not None:
+            try:
+                pss = int(getattr(psutil.Process().memory_full_info(), "pss", 0) or 0)
+            except Exception:
+                pss = 0
+
+    # Our own detector pool (thread_name_prefix="worker-sizing") is transient
+    # and not a worker, so it mustn't dilute the per-thread figure.
+    threads = sum(1 for t in threading.enumerate() if not t.name.startswith("worker-sizing"))
+    value = pss // max(1, threads) if pss > 0 else None
+
+    _PSS_CACHE["ts"] = now
+    _PSS_CACHE["value"] = value
+    return value
+
+
+# Recent raw memory caps; free RAM jitters by a few MiB between samples.
+_MEM_CAP_SAMPLES: Deque[int] = deque(maxlen=3)
+
+
+def _smooth_mem_cap(raw: int, soft_cap_by_cores: int) -> int:
+    """
+    Median of the last few memory caps, rounded down to a quantum
+    (CPU_SOFT_CAP_HYSTERESIS_QUANTUM, default max(4, soft_cap_by_cores // 8)),
+    so a one-sample dip or a 32 MiB wobble doesn't move the cap an autoscaler
+    chases. Rounding is downward since this is a memory safety limit; caps
+    below one quantum are reported as-is.
+    """
+    _MEM_CAP_SAMPLES.append(raw)
+    samples = sorted(_MEM_CAP_SAMPLES)
+    median = samples[(len(samples) - 1) // 2]  # lower median: err towards less memory
+
+    quantum = _env_int("CPU_SOFT_CAP_HYSTERESIS_QUANTUM", 0) or max(4, soft_cap_by_cores // 8)
+    if median < quantum:
+        return median
+    return median - median % quantum
+
+
+def _scale_cores(cores: int, factor: float) -> int:
+    """floor(cores * factor), in exact integer math for whole factors (the usual 4, 8)."""
+    f = int(factor)
+    if f == factor:
+        return cores * f
+    return math.floor(cores * factor)
+
+
 def _detect_cpu() -> Dict[str, Any]:
     """
     CPU sizing for a dynamic pipeline model.
@@ -51,13 +249,11 @@ def _detect_cpu() -> Dict[str, Any]:
       - soft_cap = safety guardrail (not a fixed cap); autoscaler may approach it
     """
     # ---- cores ----
-    if psutil is not None:
-        try:
-            total_cores = psutil.cpu_count(logical=True) or 1
-        except Exception:
-            total_cores = os.cpu_count() or 1
-    else:
-        total_cores = os.cpu_count() or 1
+    # A container's CPU quota caps real parallelism below the visible CPUs.
+    total_cores = _cpu_count()
+    quota = cgroup_cpu_limit()
+    if quota is not None:
+        total_cores = min(total_cores, max(1, math.ceil(quota)))
 
     # reserve some cores for OS / docker overhead
     reserve_floor = _env_int("CPU_RESERVED_CORES_FLOOR", 1)
@@ -79,26 +275,25 @@ def _detect_cpu() -> Dict[str, Any]:
     # ---- compute a *dynamic target band* (not a cap) ----
     # "target_inflight" is a hint: cores * pipeline_factor.
     # Autoscaler can chase this while it improves throughput.
-    target_inflight = int(max(1, math.floor(usable_cores * pipeline_factor)))
+    target_inflight = max(1, _scale_cores(usable_cores, pipeline_factor))
 
     # ---- soft safety cap ----
     # We provide a soft cap so you don't explode threads on weird conditions.
-    # If psutil is available, also sanity-check against RAM (very rough).
+    # If available memory is known, also sanity-check against RAM (very rough).
     # This is not "max = cores"; it's "don't be stupid if something is wrong."
     soft_cap_multiplier = _env_float("CPU_SOFT_CAP_MULTIPLIER", 8.0)  # generous
-    soft_cap_by_cores = int(max(min_cpu_workers, math.floor(usable_cores * soft_cap_multiplier)))
+    soft_cap_by_cores = max(min_cpu_workers, _scale_cores(usable_cores, soft_cap_multiplier))
 
     soft_cap_by_mem: Optional[int] = None
-    if psutil is not None:
-        try:
-            vm = psutil.virtual_memory()
-            avail = int(getattr(vm, "available", 0) or 0)
-            # rough per-thread budget (stack + python overhead). configurable.
-            per_worker_bytes = _env_int("CPU_PER_WORKER_BYTES", 32 * 1024 * 1024)  # 32 MiB
-            if avail > 0 and per_worker_bytes > 0:
-                soft_cap_by_mem = max(1, avail // per_worker_bytes)
-        except Exception:
-            soft_cap_by_mem = None
+    avail = _mem_available_bytes()
+    if avail:
+        # rough per-thread budget, allocator-aware unless set explicitly.
+        # An explicit value <= 0 disables the memory cap.
+        per_worker_bytes = _env_opt_int("CPU_PER_WORKER_BYTES")
+        if per_worker_bytes is None:
+            per_worker_bytes = max(_per_worker_bytes_estimate(), _pss_per_thread_bytes() or 0)
+        if per_worker_bytes > 0:
+            soft_cap_by_mem = _smooth_mem_cap(max(1, avail // per_worker_bytes), soft_cap_by_cores)
 
     cpu_soft_cap_workers = soft_cap_by_cores
     if soft_cap_by_mem is not None:
@@ -124,8 +319,57 @@ def _detect_cpu() -> Dict[str, Any]:
     }
 
 
+@dataclass(frozen=True)
+class LatencyStats:
+    """Recent task latency as seen by the caller (autoscaler)."""
+    p50_ms: float
+    p99_ms: float
+    inflight: int
+
+
+# Last latency-driven target; the hysteresis band holds it between calls.
+_INFLIGHT_LOCK = threading.Lock()
+_INFLIGHT_STATE: Dict[str, Optional[int]] = {"target": None}
+
+
+def compute_target_inflight(stats: LatencyStats, cpu_info: Optional[Dict[str, Any]] = None) -> int:
+    """
+    Latency-driven in-flight target, between usable_cores and
+    usable_cores * pipeline_factor.
+
+    A p99/p50 ratio above CPU_QUEUE_RATIO_HIGH (default 2.0) means work is
+    queueing rather than running, so the target drops back to usable_cores.
+    Below CPU_QUEUE_RATIO_LOW (default 1.5), and only while the current target
+    is actually filled, it grows by usable_cores per call. In between, the
+    previous target is held so the autoscaler doesn't oscillate.
+    """
+    if cpu_info is None:
+        # Cached profile, not _detect_cpu(): a fresh probe per tick would also
+        # push a sample into the _MEM_CAP_SAMPLES median window every call.
+        cpu_info = worker_profile_cheap()
+
+    cores = max(1, int(cpu_info.get("usable_cores", 1) or 1))
+    ceiling = max(cores, int(cpu_info.get("target_inflight_workers", cores) or cores))
+
+    high = _env_float("CPU_QUEUE_RATIO_HIGH", 2.0)
+    low = min(high, _env_float("CPU_QUEUE_RATIO_LOW", 1.5))
+    ratio = (stats.p99_ms / stats.p50_ms) if stats.p50_ms > 0 else 1.0
+
+    with _INFLIGHT_LOCK:
+        prev = _INFLIGHT_STATE["target"]
+        target = ceiling if prev is None else min(max(prev, cores), ceiling)
+
+        if ratio > high:
+            target = cores
+        elif ratio < low and stats.inflight >= target:
+            target = min(ceiling, target + cores)
+
+        _INFLIGHT_STATE["target"] = target
+        return target
+
+
 def _nvidia_visible_devices_allows_gpu() -> bool:
-    v = os.getenv("NVIDIA_VISIBLE_DEVICES")
+    v = _ENV.get("NVIDIA_VISIBLE_DEVICES")
     if v is None:
         return True
     v = str(v).strip().lower()
@@ -136,41 +380,96 @@ def _nvidia_visible_devices_allows_gpu() -> bool:
     return True
 
 
-def _parse_nvidia_smi() -> List[Dict[str, Any]]:
+_NVSMI_ARGV = ("nvidia-smi", "--query-gpu=name,memory.total", "--format=csv,noheader,nounits")
+
+
+def _parse_nvidia_smi() -> Tuple[List[Dict[str, Any]], int]:
+    """(devices, largest total_memory_bytes), ([], 0) if nvidia-smi is unusable."""
+    # A wedged driver can hang nvidia-smi indefinitely; bound the wait and
+    # kill it rather than stall worker sizing.
+    timeout = _env_float("NVIDIA_SMI_TIMEOUT_SEC", 2.0)
     try:
-        cmd = ["nvidia-smi", "--query-gpu=name,memory.total", "--format=csv,noheader,nounits"]
-        out = subprocess.check_output(cmd, stderr=subprocess.STDOUT, text=True)
+        p = subprocess.Popen(_NVSMI_ARGV, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
     except Exception:
-        return []
+        return [], 0
 
+    try:
+        out, _ = p.communicate(timeout=timeout)
+    except Exception:  # TimeoutExpired included
+        # wait(), not communicate(): a grandchild still holding stdout would
+        # keep the pipe open and block us again.
+        p.kill()
+        p.wait()
+        p.stdout.close()
+        return [], 0
+    if p.returncode != 0:
+        return [], 0
+
+    # memory.total with nounits is an integer MiB count; anything else
+    # ("[N/A]", driver warnings) is skipped.
     devices: List[Dict[str, Any]] = []
-    for idx, line in enumerate(out.splitlines()):
-        line = line.strip()
-        if not line:
-            continue
-        parts = [p.strip() for p in line.split(",")]
-        if len(parts) != 2:
-            continue
-        name, mem_str = parts
-        try:
-            mem_mib = float(mem_str)
-        except ValueError:
-            continue
-        total_bytes = int(mem_mib * 1024 * 1024)
-        devices.append({"index": idx, "name": name, "total_memory_bytes": total_bytes})
-    return devices
+    max_bytes = 0
+    for idx, row in enumerate(csv.reader(out.splitlines(), skipinitialspace=True)):
+        if len(row) == 2 and row[1].strip().isdigit():
+            total_bytes = int(row[1]) << 20
+            devices.append({"index": idx, "name": row[0].strip(), "total_memory_bytes": total_bytes})
+            if total_bytes > max_bytes:
+                max_bytes = total_bytes
+    return devices, max_bytes
+
+
+# NVML device handles, resolved on first use; NVML stays initialized for the
+# life of the process.
+_NVML_HANDLES: Optional[List[Any]] = None
+
+
+def _nvml_devices() -> Optional[Tuple[List[Dict[str, Any]], int]]:
+    """
+    (devices, largest total_memory_bytes) straight from NVML (the library
+    nvidia-smi wraps): no fork, no text parsing. None if pynvml isn't
+    installed, so the caller can fall back to nvidia-smi; ([], 0) if NVML
+    itself reports no usable driver/GPU.
+    """
+    global _NVML_HANDLES
+
+    # Import inside function so worker sizing works without pynvml installed
+    try:
+        import pynvml  # type: ignore
+    except ImportError:
+        return None
+
+    try:
+        if _NVML_HANDLES is None:
+            pynvml.nvmlInit()
+            _NVML_HANDLES = [pynvml.nvmlDeviceGetHandleByIndex(i) for i in range(pynvml.nvmlDeviceGetCount())]
+
+        devices: List[Dict[str, Any]] = []
+        max_bytes = 0
+        for idx, h in enumerate(_NVML_HANDLES):
+            name = pynvml.nvmlDeviceGetName(h)
+            if isinstance(name, bytes):  # older pynvml returns bytes
+                name = name.decode("utf-8", "replace")
+            total_bytes = int(pynvml.nvmlDeviceGetMemoryInfo(h).total)
+            devices.append({"index": idx, "name": name, "total_memory_bytes": total_bytes})
+            if total_bytes > max_bytes:
+                max_bytes = total_bytes
+        return devices, max_bytes
+    except Exception:
+        return [], 0
 
 
 def _detect_gpu() -> Dict[str, Any]:
     if not _nvidia_visible_devices_allows_gpu():
         return {"gpu_present": False, "gpu_count": 0, "vram_gb": None, "devices": [], "max_gpu_workers": 0}
 
-    devices = _parse_nvidia_smi()
+    probed = _nvml_devices()
+    if probed is None:
+        probed = _parse_nvidia_smi()
+    devices, max_bytes = probed
     if not devices:
         return {"gpu_present": False, "gpu_count": 0, "vram_gb": None, "devices": [], "max_gpu_workers": 0}
 
     gpu_count = len(devices)
-    max_bytes = max(int(d.get("total_memory_bytes", 0) or 0) for d in devices)
     vram_gb = (max_bytes / float(1024 ** 3)) if max_bytes > 0 else None
 
     # keep your current heuristic; GPU autoscaling belongs in app.py
@@ -185,6 +484,46 @@ def _detect_gpu() -> Dict[str, Any]:
     }
 
 
+@functools.lru_cache(maxsize=1)
+def _jax_devices_cached() -> List[str]:
+    """
+    str() of every jax.devices() entry, or [] if JAX is missing or fails.
+
+    find_spec only consults the import path, so hosts without JAX never pay
+    for the import; hosts with it pay for it (and XLA init) once per process.
+    """
+    if importlib.util.find_spec("jax") is None:
+        return []
+    try:
+        import jax  # type: ignore
+        return [str(d) for d in jax.devices()]
+    except Exception:
+        return []
+
+
+def _tpu_possible(jax_platform: str, hinted: bool) -> bool:
+    """
+    False when JAX is pinned away from TPU (JAX_PLATFORM_NAME=cpu/gpu/...,
+    or a JAX_PLATFORMS list without tpu), or when nothing on the host looks
+    like a Cloud TPU: no TPU env hints and no /dev/accel* (v2-v4) or
+    /dev/vfio/* (v5e and later) device nodes.
+    """
+    if jax_platform and jax_platform != "tpu":
+        return False
+    platforms = str(_ENV.get("JAX_PLATFORMS", "")).strip().lower()
+    if platforms and "tpu" not in [p.strip() for p in platforms.split(",")]:
+        return False
+
+    if hinted or jax_platform == "tpu" or "tpu" in platforms or "TPU_WORKER_HOSTNAMES" in _ENV:
+        return True
+    if glob.glob("/dev/accel*"):
+        return True
+    try:
+        return any(name != "vfio" for name in os.listdir("/dev/vfio"))
+    except OSError:
+        return False
+
+
 def _detect_tpu() -> Dict[str, Any]:
     """
     TPU sizing: start conservative.
@@ -196,38 +535,207 @@ def _detect_tpu() -> Dict[str, Any]:
         return {"tpu_present": False, "tpu_kind": None, "devices": [], "max_tpu_workers": 0}
 
     # Hints (not proof)
-    jax_platform = str(os.getenv("JAX_PLATFORM_NAME", "")).strip().lower()
-    hinted = (jax_platform == "tpu") or (os.getenv("TPU_NAME") is not None) or (os.getenv("TPU_TYPE") is not None)
-
-    try:
-        import jax  # type: ignore
-        devs = [str(d) for d in jax.devices()]
-        tpu_devs = [d for d in devs if "TPU" in d.upper()]
-        if tpu_devs:
-            # Conservative until proven otherwise (TPU parallelism != python threads)
-            return {
-                "tpu_present": True,
-                "tpu_kind": "jax",
-                "devices": tpu_devs,
-                "max_tpu_workers": 1,
-            }
-    except Exception:
-        pass
+    jax_platform = str(_ENV.get("JAX_PLATFORM_NAME", "")).strip().lower()
+    hinted = (jax_platform == "tpu") or ("TPU_NAME" in _ENV) or ("TPU_TYPE" in _ENV)
+
+    # jax.devices() initializes XLA backends (slow, and may attach devices),
+    # so only ask JAX when TPU is possible at all.
+    if not _tpu_possible(jax_platform, hinted):
+        return {"tpu_present": False, "tpu_kind": ("hinted" if hinted else None), "devices": [], "max_tpu_workers": 0}
+
+    tpu_devs = [d for d in _jax_devices_cached() if "TPU" in d.upper()]
+    if tpu_devs:
+        # Conservative until proven otherwise (TPU parallelism != python threads)
+        return {
+            "tpu_present": True,
+            "tpu_kind": "jax",
+            "devices": tpu_devs,
+            "max_tpu_workers": 1,
+        }
 
     # If we only have hints but no proof, don't claim TPU.
     return {"tpu_present": False, "tpu_kind": ("hinted" if hinted else None), "devices": [], "max_tpu_workers": 0}
 
 
-def build_worker_profile() -> Dict[str, Any]:
+@dataclass(frozen=True)
+class CpuInfo:
+    total_cores: int
+    reserved_cores: int
+    usable_cores: int
+    pipeline_factor: float
+    target_inflight_workers: int
+    cpu_soft_cap_workers: int
+    min_cpu_workers: int
+    max_cpu_workers: int
+
+
+@dataclass(frozen=True)
+class GpuDevice:
+    index: int
+    name: str
+    total_memory_bytes: int
+
+
+@dataclass(frozen=True)
+class GpuInfo:
+    gpu_present: bool
+    gpu_count: int
+    vram_gb: Optional[float]
+    devices: Tuple[GpuDevice, ...]
+    max_gpu_workers: int
+
+
+@dataclass(frozen=True)
+class TpuInfo:
+    tpu_present: bool
+    tpu_kind: Optional[str]
+    devices: Tuple[str, ...]
+    max_tpu_workers: int
+
+
+@dataclass(frozen=True)
+class WorkerProfile:
+    """Typed, immutable form of build_worker_profile()'s dict."""
+    cpu: CpuInfo
+    gpu: GpuInfo
+    tpu: TpuInfo
+    max_total_workers: int
+    current_workers: int
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "WorkerProfile":
+        gpu = d["gpu"]
+        tpu = d["tpu"]
+        return cls(
+            cpu=CpuInfo(**d["cpu"]),
+            gpu=GpuInfo(
+                gpu_present=gpu["gpu_present"],
+                gpu_count=gpu["gpu_count"],
+                vram_gb=gpu["vram_gb"],
+                devices=tuple(GpuDevice(**dev) for dev in gpu["devices"]),
+                max_gpu_workers=gpu["max_gpu_workers"],
+            ),
+            tpu=TpuInfo(
+                tpu_present=tpu["tpu_present"],
+                tpu_kind=tpu["tpu_kind"],
+                devices=tuple(tpu["devices"]),
+                max_tpu_workers=tpu["max_tpu_workers"],
+            ),
+            max_total_workers=d["workers"]["max_total_workers"],
+            current_workers=d["workers"]["current_workers"],
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Same shape as build_worker_profile() (lists, not tuples)."""
+        gpu = asdict(self.gpu)
+        gpu["devices"] = list(gpu["devices"])
+        tpu = asdict(self.tpu)
+        tpu["devices"] = list(tpu["devices"])
+        return {
+            "cpu": asdict(self.cpu),
+            "gpu": gpu,
+            "tpu": tpu,
+            "workers": {
+                "max_total_workers": self.max_total_workers,
+                "current_workers": self.current_workers,
+            },
+        }
+
+
+# Hardware doesn't change under a running process, so detection (nvidia-smi
+# fork, JAX import) runs at most once per WORKER_PROFILE_TTL_SEC.
+_PROFILE_LOCK = threading.Lock()
+_PROFILE_CACHE: Dict[str, Any] = {"ts": 0.0, "entry": None}
+
+
+def build_worker_profile(stats: Optional[LatencyStats] = None) -> Dict[str, Any]:
     """
     Returns a stable, contract-friendly worker profile.
     Even in TPU-only mode, we keep cpu/gpu keys to avoid schema drift.
+
+    Cached for WORKER_PROFILE_TTL_SEC (default 30; 0 disables). Each caller
+    gets its own copy, so mutating the result never leaks into the cache.
+
+    With stats, cpu.target_inflight_workers is the latency-driven target from
+    compute_target_inflight() instead of the static cores * pipeline_factor.
+    """
+    profile = _cached_profile()
+    if stats is not None:
+        profile["cpu"]["target_inflight_workers"] = compute_target_inflight(stats, profile["cpu"])
+    return profile
+
+
+def worker_profile_cheap() -> Dict[str, Any]:
+    """
+    Flat CPU sizing for hot autoscaler ticks. Reads the last full profile
+    regardless of its TTL, so it never probes GPU/TPU or copies nested dicts;
+    the trade-off is that max_total_workers carries GPU/TPU counts from that
+    profile, however old. Only the very first call (no profile yet) builds one.
+    """
+    entry = _PROFILE_CACHE["entry"]
+    profile = (entry or _fresh_profile())[0]
+
+    cpu = profile["cpu"]
+    return {
+        "usable_cores": cpu["usable_cores"],
+        "target_inflight_workers": cpu["target_inflight_workers"],
+        "cpu_soft_cap_workers": cpu["cpu_soft_cap_workers"],
+        "min_cpu_workers": cpu["min_cpu_workers"],
+        "max_cpu_workers": cpu["max_cpu_workers"],
+        "max_total_workers": profile["workers"]["max_total_workers"],
+    }
+
+
+def get_worker_profile(stats: Optional[LatencyStats] = None) -> WorkerProfile:
+    """
+    build_worker_profile() as a frozen WorkerProfile: attribute access, and
+    shared with every caller (immutable, so no per-call copy).
+    Use .to_dict() where the legacy dict/JSON shape is needed.
     """
+    profile = _fresh_profile()[1]
+    if stats is not None:
+        cpu = profile.cpu
+        target = compute_target_inflight(stats, {
+            "usable_cores": cpu.usable_cores,
+            "target_inflight_workers": cpu.target_inflight_workers,
+        })
+        profile = replace(profile, cpu=replace(cpu, target_inflight_workers=target))
+    return profile
+
+
+def _cached_profile() -> Dict[str, Any]:
+    return copy.deepcopy(_fresh_profile()[0])
+
+
+def _fresh_profile() -> Tuple[Dict[str, Any], WorkerProfile]:
+    """The shared (dict, WorkerProfile) pair, rebuilt once the TTL expires. Don't mutate."""
+    ttl = _env_float("WORKER_PROFILE_TTL_SEC", 30.0)
+
+    entry = _PROFILE_CACHE["entry"]
+    if entry is not None and time.monotonic() - _PROFILE_CACHE["ts"] < ttl:
+        return entry
+
+    # One detector run per expiry; concurrent callers wait and reuse it.
+    with _PROFILE_LOCK:
+        entry = _PROFILE_CACHE["entry"]
+        if entry is None or time.monotonic() - _PROFILE_CACHE["ts"] >= ttl:
+            value = _build_worker_profile()
+            entry = (value, WorkerProfile.from_dict(value))
+            _PROFILE_CACHE["entry"] = entry
+            _PROFILE_CACHE["ts"] = time.monotonic()
+        return entry
+
+
+def _build_worker_profile() -> Dict[str, Any]:
     tpu_only = _env_bool("TPU_ONLY", False)
 
-    cpu_info = _detect_cpu()
-    gpu_info = _detect_gpu()
-    tpu_info = _detect_tpu()
+    # Independent probes; GPU (NVML/nvidia-smi) and TPU (JAX import) mostly
+    # wait outside the GIL, so total latency is the slowest one, not the sum.
+    with ThreadPoolExecutor(max_workers=3, thread_name_prefix="worker-sizing") as ex:
+        f_cpu = ex.submit(_detect_cpu)
+        f_gpu = ex.submit(_detect_gpu)
+        f_tpu = ex.submit(_detect_tpu)
+        cpu_info, gpu_info, tpu_info = f_cpu.result(), f_gpu.result(), f_tpu.result()
 
     # TPU-only mode: keep keys, but enforce behavior.
     if tpu_only: